@@ -10,322 +10,672 @@ __copyright__ = "Copyright (c) 2022-present Tanner B. Corcoran"
 
 
 from . import types
+import functools
+import json
+import operator
+import pathlib
+import re
 import sqlite3
+import struct
+import threading
 import typing
+import weakref
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_LITERAL = "literal"
+_SEP, _KV, _OPEN, _CLOSE = chr(130), chr(131), chr(134), chr(135)
+_ITEM_SEP = _CLOSE + _SEP + _OPEN
+_OPEN_BYTES = _OPEN.encode()
+_AND, _OR = " AND ", " OR "
+_PART_GET = operator.itemgetter(0, 1, 2)
+
+
+def _expr_kind(expr: types.Expression | typing.Any) -> typing.Hashable:
+    if expr is types.MISSING:
+        return types.MISSING
+    if isinstance(expr, types.Expression):
+        if expr.value is types.MISSING:
+            return types.MISSING
+        return expr.shape()
+    return _LITERAL
+
+
+def _statement(column: str, kind: typing.Hashable) -> str:
+    if kind == _LITERAL:
+        return f"{column} IS ?"
+    return kind[0].statement(column, kind)
+
+
+def _extend_parameters(parameters: list, expr: types.Expression | typing.Any,
+                       compiler: typing.Callable[[typing.Any], typing.Any]) -> None:
+    if expr is types.MISSING:
+        return
+    if isinstance(expr, types.Expression):
+        if expr.value is not types.MISSING:
+            parameters.extend(expr.parameters(compiler))
+        return
+    parameters.append(compiler(expr))
+
+
+def _join_expr(values: typing.Iterable[types.Expression | typing.Any], column: str,
+               compiler: typing.Callable[[typing.Any], typing.Any], sep: str
+               ) -> tuple[str, list]:
+    statements, parameters = db._build_where([db.part(column, v, compiler) for v in values])
+    return sep.join(statements), parameters
+
+
+def _assemble(table: str, operation: str, where: str, columns: tuple[str, ...] = ()) -> str:
+    if operation == "SELECT":
+        query = f"SELECT * FROM {table}"
+    elif operation == "DELETE":
+        query = f"DELETE FROM {table}"
+    elif operation == "UPDATE":
+        query = f"UPDATE {table} SET {','.join([f'{c}=?' for c in columns])}"
+    elif columns:
+        # `operation` may carry a conflict clause, e.g. "INSERT OR IGNORE"
+        placeholders = "?" + ",?" * (len(columns) - 1)
+        return f"{operation} INTO {table} ({','.join(columns)}) VALUES ({placeholders})"
+    else:
+        return f"{operation} INTO {table}"
+    return f"{query} WHERE {where}" if where else query
+
+
+@functools.lru_cache(maxsize=512)
+def _template(table: str, operation: str, shape: tuple = (), matchall: bool = True,
+              columns: tuple[str, ...] = ()) -> str:
+    """Build the query string for ``operation`` on ``table``, where ``shape`` is the shape of
+    the where-clause (see `db._where_plan`). The result only depends on the arguments, so
+    repeated calls with the same shape skip the formatting entirely.
+    
+    """
+    joinwith = _AND if matchall else _OR
+    where = joinwith.join([_statement(column, kind) for column, kind in shape
+                           if kind is not types.MISSING])
+    return _assemble(table, operation, where, columns)
+
+
+def _json_dumps(value: typing.Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+if orjson is not None:
+    # orjson only handles integers that fit in 64 bits: it refuses to encode larger ones and
+    # decodes them as floats, so values which may hold any go through `json` instead (note
+    # that orjson still stores non-finite floats as null, where `json` writes NaN/Infinity)
+    _LONG_DIGITS = re.compile(r"\d{19}")
+
+    def _dumps(value: typing.Any) -> str:
+        try:
+            return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        except orjson.JSONEncodeError:
+            return _json_dumps(value)
+
+    def _loads(value: str | bytes) -> typing.Any:
+        text = value.decode() if isinstance(value, bytes) else value
+        if _LONG_DIGITS.search(text) is None:
+            try:
+                return orjson.loads(text)
+            except orjson.JSONDecodeError:
+                pass
+        return json.loads(text)
+else:
+    _dumps = _json_dumps
+    _loads = json.loads
 
 
-def _compile(value, compiler: typing.Callable[[typing.Any], typing.Any]) -> typing.Any:
-    return value if compiler is types.MISSING else compiler(value)
+class ListCompiler(types.Compiler):
+    __slots__ = ()
 
+    def __call__(self, value: list) -> typing.Optional[str]:
+        return value and _dumps(value)
 
-def _decompile(value, decomipler: typing.Callable[[typing.Any], typing.Any]) -> typing.Any:
-    return value if decomipler is types.MISSING else decomipler(value)
 
+def _legacy_text(value: str | bytes) -> str | None:
+    # values stored by the delimiter-based encoding used before JSON start with `_OPEN`
+    if isinstance(value, bytes):
+        return value.decode() if value.startswith(_OPEN_BYTES) else None
+    return value if value.startswith(_OPEN) else None
 
-class ListCompiler(types.Compiler):
-    def __call__(self, value: list) -> typing.Optional[str]:
-        return value and chr(130).join([f"{chr(134)}{v}{chr(135)}" for v in value])
-        
 
 class ListDecompiler(types.Decompiler):
-    def __call__(self, value: str) -> list[types.T]:
-        return value and [self.format(v[1:-1])[0] for v in value.split(chr(130))]
+    __slots__ = ()
+
+    def __call__(self, value: str | bytes) -> list[types.T]:
+        if not value:
+            return value
+        legacy = _legacy_text(value)
+        items = legacy[1:-1].split(_ITEM_SEP) if legacy is not None else _loads(value)
+
+        # each element is a single value, so it is always decompiled with the first type
+        if not self._types:
+            return list(items)
+        return list(map(self._types[0], items))
+
+
+class IntListCompiler(types.Compiler):
+    """Packs a list of integers into a BLOB of little-endian int64s."""
+    __slots__ = ()
+
+    def __call__(self, value: list[int]) -> bytes:
+        return struct.pack(f"<{len(value)}q", *value)
+
+
+class IntListDecompiler(ListDecompiler):
+    """Unpacks a BLOB written by `IntListCompiler`. Text values (stored as JSON or in the
+    legacy delimited format) are decoded as by `ListDecompiler`.
+    
+    """
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        super().__init__(int)
+
+    def __call__(self, value: bytes | str) -> list[int]:
+        if isinstance(value, bytes):
+            return list(struct.unpack(f"<{len(value) // 8}q", value))
+        return super().__call__(value)
 
 
 class DictCompiler(types.Compiler):
+    __slots__ = ()
+
     def __call__(self, value: dict) -> typing.Optional[str]:
-        return value and chr(130).join([f"{chr(134)}{k}{chr(131)}{v}{chr(135)}" for k, v in
-                                        value.items()])
+        return value and _dumps(value)
 
 
 class DictDecompiler(types.Decompiler):
-    def __call__(self, value: str) -> types.T:
-        return value and dict([self.format(*(v[1:-1]).split(chr(131))) for v in
-                               value.split(chr(130))])
+    __slots__ = ()
+
+    def __call__(self, value: str | bytes) -> types.T:
+        if not value:
+            return value
+        legacy = _legacy_text(value)
+        if legacy is not None:
+            items = [v.split(_KV) for v in legacy[1:-1].split(_ITEM_SEP)]
+        else:
+            items = _loads(value).items()
+        if not self._types:
+            return dict(items)
+        key_type, value_type = self._expand(2)[:2]
+        return {key_type(k): value_type(v) for k, v in items}
 
 
 class or_(types.Expression):
+    __slots__ = ()
+
     def __init__(self, *values: types.Expression | typing.Any) -> None:
         self.value = types.MISSING if all(v is types.MISSING for v in values) else values
-    
+
+    def shape(self) -> tuple | None:
+        kinds = tuple(_expr_kind(v) for v in self.value)
+        return None if any(k is None for k in kinds) else (or_, kinds)
+
+    @staticmethod
+    def statement(column: str, shape: tuple) -> str:
+        return _OR.join([_statement(column, k) for k in shape[1] if k is not types.MISSING])
+
+    def parameters(self, compiler: typing.Callable[[typing.Any], typing.Any]) -> list:
+        parameters: list = []
+        for v in self.value:
+            _extend_parameters(parameters, v, compiler)
+        return parameters
+
     def format(self, column: str,
                compiler: typing.Callable[[typing.Any], typing.Any]) -> tuple[str, list]:
-        statements, parameters = db._build_where([db.part(column, v, compiler) for v in self.value])
-        return " OR ".join(statements), list(parameters)
+        return _join_expr(self.value, column, compiler, _OR)
 
 
 class and_(types.Expression):
+    __slots__ = ()
+
     def __init__(self, *values: types.Expression | typing.Any) -> None:
         self.value = types.MISSING if all(v is types.MISSING for v in values) else values
-    
+
+    def shape(self) -> tuple | None:
+        kinds = tuple(_expr_kind(v) for v in self.value)
+        return None if any(k is None for k in kinds) else (and_, kinds)
+
+    @staticmethod
+    def statement(column: str, shape: tuple) -> str:
+        return _AND.join([_statement(column, k) for k in shape[1] if k is not types.MISSING])
+
+    def parameters(self, compiler: typing.Callable[[typing.Any], typing.Any]) -> list:
+        parameters: list = []
+        for v in self.value:
+            _extend_parameters(parameters, v, compiler)
+        return parameters
+
     def format(self, column: str,
                compiler: typing.Callable[[typing.Any], typing.Any]) -> tuple[str, list]:
-        statements, parameters = db._build_where([db.part(column, v, compiler) for v in self.value])
-        return " AND ".join(statements), list(parameters)
+        return _join_expr(self.value, column, compiler, _AND)
 
 
 class is_not(types.Expression):
+    __slots__ = ()
+
     def __init__(self, value: types.Expression | typing.Any) -> None:
         """Succeeds if: column is not equal to ``value`` or if ``value``
         (expression) resolves to false.
         
         """
         self.value = value
-    
+
+    def shape(self) -> tuple | None:
+        kind = _expr_kind(self.value)
+        return None if kind is None or kind is types.MISSING else (is_not, kind)
+
+    @staticmethod
+    def statement(column: str, shape: tuple) -> str:
+        if shape[1] == _LITERAL:
+            return f"{column} IS NOT ?"
+        return f"NOT {_statement(column, shape[1])}"
+
+    def parameters(self, compiler: typing.Callable[[typing.Any], typing.Any]) -> list:
+        if isinstance(self.value, types.Expression):
+            return self.value.parameters(compiler)
+        return [compiler(self.value)]
+
     def format(self, column: str,
                compiler: typing.Callable[[typing.Any], typing.Any]) -> tuple[str, list]:
         if isinstance(self.value, types.Expression):
             stmt, params = self.value.format(column, compiler)
             return (f"NOT {stmt}", params)
-        return (f"{column} IS NOT ?", [_compile(self.value, compiler)])
+        return (f"{column} IS NOT ?", [compiler(self.value)])
+
 
+class _CmpExpr(types.Expression):
+    __slots__ = ()
+    _TMPL: str
 
-class is_(types.Expression):
     def __init__(self, value: typing.Any) -> None:
-        """Succeeds if: column is equal to ``value``.
-        
-        """
         self.value = value
 
-    def format(self, column: str,
-               compiler: typing.Callable[[typing.Any], typing.Any]) -> tuple[str, list]:
-        return (f"{column} IS ?", [_compile(self.value, compiler)])
-
+    def shape(self) -> tuple:
+        return (type(self),)
 
-class collate_nocase(types.Expression):
-    def __init__(self, value: str) -> None:
-        """Succeeds if column is equal to ``value`` (NOCASE compare).
-        
-        """
-        self.value = value
+    @classmethod
+    def statement(cls, column: str, shape: tuple) -> str:
+        return cls._TMPL.format(column)
 
-    def format(self, column: str, compiler: typing.Callable[[str], str]) -> tuple[str, list]:
-        return (f"{column} IS ? COLLATE NOCASE", [_compile(self.value, compiler)])
+    def parameters(self, compiler: typing.Callable[[typing.Any], typing.Any]) -> list:
+        return [compiler(self.value)]
 
 
-class collate_binary(types.Expression):
-    def __init__(self, value: typing.Any) -> None:
-        """Succeeds if column is equal to ``value`` (BINARY compare).
-        
-        """
-        self.value = value
+class is_(_CmpExpr):
+    """Succeeds if: column is equal to ``value``.
+    
+    """
+    __slots__ = ()
+    _TMPL = "{} IS ?"
 
-    def format(self, column: str,
-               compiler: typing.Callable[[typing.Any], typing.Any]) -> tuple[str, list]:
-        return (f"{column} IS ? COLLATE BINARY", [_compile(self.value, compiler)])
 
+class collate_nocase(_CmpExpr):
+    """Succeeds if column is equal to ``value`` (NOCASE compare).
+    
+    """
+    __slots__ = ()
+    _TMPL = "{} IS ? COLLATE NOCASE"
 
-class collate_rtrim(types.Expression):
-    def __init__(self, value: str) -> None:
-        """Succeeds if column is equal to ``value`` (RTRIM compare).
-        
-        """
-        self.value = value
 
-    def format(self, column: str, compiler: typing.Callable[[str], str]) -> tuple[str, list]:
-        return (f"{column} IS ? COLLATE RTRIM", [_compile(self.value, compiler)])
+class collate_binary(_CmpExpr):
+    """Succeeds if column is equal to ``value`` (BINARY compare).
+    
+    """
+    __slots__ = ()
+    _TMPL = "{} IS ? COLLATE BINARY"
 
 
-class substr(types.Expression):
-    def __init__(self, value: str) -> None:
-        """Succeeds if ``value`` is a substring of column (CASE compare).
-        
-        """
-        self.value = value
+class collate_rtrim(_CmpExpr):
+    """Succeeds if column is equal to ``value`` (RTRIM compare).
+    
+    """
+    __slots__ = ()
+    _TMPL = "{} IS ? COLLATE RTRIM"
 
-    def format(self, column: str, compiler: typing.Callable[[str], str]) -> tuple[str, list]:
-        return (f"instr({column}, ?)", [_compile(self.value, compiler)])
 
+class substr(_CmpExpr):
+    """Succeeds if ``value`` is a substring of column (CASE compare).
+    
+    """
+    __slots__ = ()
+    _TMPL = "instr({}, ?)"
 
-class nocase_substr(types.Expression):
-    def __init__(self, value: str) -> None:
-        """Succeeds if ``value`` is a substring of column (NOCASE compare).
-        
-        """
-        self.value = value
 
-    def format(self, column: str, compiler: typing.Callable[[str], str]) -> tuple[str, list]:
-        return (f"{column} LIKE '%'||?||'%' ESCAPE '\\'", [_compile(self.value, compiler)])
+class nocase_substr(_CmpExpr):
+    """Succeeds if ``value`` is a substring of column (NOCASE compare).
+    
+    """
+    __slots__ = ()
+    _TMPL = "{} LIKE '%'||?||'%' ESCAPE '\\'"
 
 
 class between(types.Expression):
+    __slots__ = ()
+
     def __init__(self, a: int | float, b: int | float) -> None:
         """Succeeds if column is between ``a`` and ``b``.
         
         """
         self.value = [a, b]
 
-    def format(self, column: str,
-               compiler: typing.Callable[[int | float, int | float], list[int | float]]
-                     ) -> tuple[str, list]:
-        return (f"{column} BETWEEN ? AND ?", _compile(self.value, compiler))
-
-
-class greater_than(types.Expression):
-    def __init__(self, value: int | float) -> None:
-        """Succeeds if column greater than ``value``.
-        
-        """
-        self.value = value
+    def shape(self) -> tuple:
+        return (between,)
 
-    def format(self, column: str,
-               compiler: typing.Callable[[int | float], int | float]) -> tuple[str, list]:
-        return (f"{column} > ?", _compile(self.value, compiler))
+    @staticmethod
+    def statement(column: str, shape: tuple) -> str:
+        return f"{column} BETWEEN ? AND ?"
 
+    def parameters(self, compiler: typing.Callable[[int | float, int | float], list[int | float]]
+                   ) -> list:
+        return compiler(self.value)
 
-class greater_than_or_equal(types.Expression):
-    def __init__(self, value: int | float) -> None:
-        """Succeeds if column greater than or equal to ``value``.
-        
-        """
-        self.value = value
 
-    def format(self, column: str,
-               compiler: typing.Callable[[int | float], int | float]) -> tuple[str, list]:
-        return (f"{column} >= ?", [_compile(self.value, compiler)])
+class greater_than(_CmpExpr):
+    """Succeeds if column greater than ``value``.
+    
+    """
+    __slots__ = ()
+    _TMPL = "{} > ?"
 
 
-class less_than(types.Expression):
-    def __init__(self, value: int | float) -> None:
-        """Succeeds if column less than ``value``.
-        
-        """
-        self.value = value
+class greater_than_or_equal(_CmpExpr):
+    """Succeeds if column greater than or equal to ``value``.
+    
+    """
+    __slots__ = ()
+    _TMPL = "{} >= ?"
 
-    def format(self, column: str,
-               compiler: typing.Callable[[int | float], int | float]) -> tuple[str, list]:
-        return (f"{column} < ?", [_compile(self.value, compiler)])
 
+class less_than(_CmpExpr):
+    """Succeeds if column less than ``value``.
+    
+    """
+    __slots__ = ()
+    _TMPL = "{} < ?"
 
-class less_than_or_equal(types.Expression):
-    def __init__(self, value: int | float) -> None:
-        """Succeeds if column less than or equal to ``value``.
-        
-        """
-        self.value = value
 
-    def format(self, column: str,
-               compiler: typing.Callable[[int | float], int | float]) -> tuple[str, list]:
-        return (f"{column} <= ?", [_compile(self.value, compiler)])
+class less_than_or_equal(_CmpExpr):
+    """Succeeds if column less than or equal to ``value``.
+    
+    """
+    __slots__ = ()
+    _TMPL = "{} <= ?"
 
 
 class custom(types.Expression):
+    __slots__ = ()
+
     def __init__(self, expr: str, *params: typing.Any) -> None:
         """Succeeds if ``expr`` (given ``params``) succeeds.
         
         """
         self.value = (expr, list(params))
 
-    def format(self, column: str, compiler: None) -> tuple[str, list]:
-        return self.value
+    def shape(self) -> tuple:
+        return (custom, self.value[0])
+
+    @staticmethod
+    def statement(column: str, shape: tuple) -> str:
+        return shape[1]
+
+    def parameters(self, compiler: None) -> list:
+        return self.value[1]
+
+
+class _Connection(sqlite3.Connection):
+    # `sqlite3.Connection` itself does not support weak references
+    pass
 
 
 class AutoSqliteConnection:
-    def __init__(self, path: str) -> None:
+    PRAGMAS = ("PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL", "PRAGMA temp_store=MEMORY",
+               "PRAGMA cache_size=-65536", "PRAGMA mmap_size=268435456")
+    READONLY_PRAGMAS = ("PRAGMA query_only=1", "PRAGMA temp_store=MEMORY",
+                        "PRAGMA cache_size=-65536", "PRAGMA mmap_size=268435456")
+    CACHED_STATEMENTS = 1024
+
+    def __init__(self, path: str, fast: bool = True, readonly: bool = False) -> None:
+        """A long-lived connection to the database at ``path``. Each thread opens (and keeps)
+        its own autocommit connection, which is closed when the thread exits; call `close` to
+        release all of them early. Up to ``CACHED_STATEMENTS`` prepared statements are kept
+        per connection, which comfortably covers the query templates cached by `db`. If
+        ``fast`` is set, ``PRAGMAS`` (WAL journaling, relaxed syncing and larger caches) are
+        applied to every connection.
+        
+        If ``readonly`` is set, the (existing) database file is opened with ``mode=ro`` and
+        ``READONLY_PRAGMAS`` are applied instead, which is only useful next to a writable
+        connection that sets up the schema and journal mode.
+        
+        """
         self._path = path
-        self._conn: sqlite3.Connection = None
-    
+        self._fast = fast
+        self._readonly = readonly
+        # set by the owner once every table it needs has been created
+        self.schema_ready = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # only the thread-local storage holds a connection strongly, so it is released with its
+        # thread; this set just allows `close` to reach the ones still alive
+        self._conns: weakref.WeakSet[_Connection] = weakref.WeakSet()
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._readonly:
+            conn = sqlite3.connect(f"{pathlib.Path(self._path).resolve().as_uri()}?mode=ro",
+                                   check_same_thread=False, isolation_level=None,
+                                   cached_statements=self.CACHED_STATEMENTS, uri=True,
+                                   factory=_Connection)
+            pragmas = self.READONLY_PRAGMAS if self._fast else ("PRAGMA query_only=1",)
+        else:
+            conn = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None,
+                                   cached_statements=self.CACHED_STATEMENTS, factory=_Connection)
+            pragmas = self.PRAGMAS if self._fast else ()
+        for pragma in pragmas:
+            conn.execute(pragma)
+        with self._lock:
+            self._conns.add(conn)
+        self._local.conn = conn
+        return conn
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        return self._connect() if conn is None else conn
+
     def __enter__(self) -> tuple[sqlite3.Connection, sqlite3.Cursor]:
-        self._conn = sqlite3.connect(self._path)
-        return self._conn, self._conn.cursor()
-    
+        conn = self._conn
+        self._local.cur = conn.cursor()
+        return conn, self._local.cur
+
     def __exit__(self, *_) -> None:
-        self._conn = self._conn.close()
+        self._local.cur.close()
+
+    def execute(self, query: str, parameters: typing.Sequence = ()) -> sqlite3.Cursor:
+        """Execute ``query`` on this thread's connection. Queries are looked up in the
+        connection's statement cache by their text, so a repeated (templated) query reuses its
+        prepared statement instead of being parsed and planned again.
+        
+        """
+        return self._conn.execute(query, parameters)
+
+    def close(self) -> None:
+        with self._lock:
+            conns, self._conns = list(self._conns), weakref.WeakSet()
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
 
 
 class db:
-    def __init__(self, db_conn: AutoSqliteConnection, table: str) -> None:
+    def __init__(self, db_conn: AutoSqliteConnection, table: str,
+                 read_conn: AutoSqliteConnection = None) -> None:
+        # `get` and `get_columns` go through ``read_conn`` (if given), everything else through
+        # ``db_conn``
         self._db_conn = db_conn
+        self._read_conn = db_conn if read_conn is None else read_conn
         self.table = table
 
-    class part:
-        def __init__(self, column: str, expr: typing.Any,
-                     compiler: typing.Callable = types.MISSING,
-                     decompiler: typing.Callable = types.MISSING) -> None:
-            self.column = column
-            self.expr = expr
-            self.compiler = compiler
-            self.decompiler = decompiler
+    class part(typing.NamedTuple):
+        column: str
+        expr: typing.Any
+        compiler: typing.Callable[[typing.Any], typing.Any] = types.MISSING
+        decompiler: typing.Callable[[typing.Any], typing.Any] = types.MISSING
+
+    @staticmethod
+    def _where_plan(parts: typing.Iterable[part]) -> tuple[tuple | None, list]:
+        """Compute the shape of the where-clause (the `_template` cache key) together with its
+        parameters in a single pass. The shape is ``None`` if an expression cannot be cached.
+        
+        """
+        MISSING = types.MISSING
+        Expression = types.Expression
+        shape: list[tuple[str, typing.Hashable]] = []
+        parameters: list = []
+        for column, expr, compiler in map(_PART_GET, parts):
+            if expr is MISSING:
+                kind = MISSING
+            elif isinstance(expr, Expression):
+                if expr.value is MISSING:
+                    kind = MISSING
+                else:
+                    kind = expr.shape()
+                    if kind is None:
+                        return None, parameters
+                    parameters.extend(expr.parameters(compiler))
+            else:
+                kind = _LITERAL
+                parameters.append(compiler(expr))
+            shape.append((column, kind))
+        return tuple(shape), parameters
 
     @staticmethod
     def _build_where(parts: typing.Iterable[part]) -> tuple[list[str], list]:
-        statements = []
-        parameters = []
-        for p in parts:
-            if p.expr is types.MISSING:
+        MISSING = types.MISSING
+        Expression = types.Expression
+        statements: list[str] = []
+        parameters: list = []
+        for column, e, compiler in map(_PART_GET, parts):
+            if e is MISSING:
                 continue
-            
-            if isinstance(p.expr, types.Expression):
-                if p.expr.value is types.MISSING:
+
+            # literals are inlined rather than wrapped in `is_`
+            if isinstance(e, Expression):
+                if e.value is MISSING:
                     continue
-                _expr = p.expr
+                s, params = e.format(column, compiler)
+                statements.append(s)
+                parameters.extend(params)
             else:
-                _expr = is_(p.expr)
-
-            s, p = _expr.format(p.column, p.compiler)
-            statements.append(s)
-            parameters.extend(p)
+                statements.append(column + " IS ?")
+                parameters.append(compiler(e))
 
         return (statements, parameters)
-    
-    @staticmethod
-    def _build_insert(parts: typing.Iterable[part]) -> tuple[list[str], list]:
-        return ([p.column for p in parts if p.expr is not types.MISSING],
-                [_compile(p.expr, p.compiler) for p in parts if p.expr is not types.MISSING])
-    
+
     @staticmethod
-    def _build_set(parts: typing.Iterable[part]) -> tuple[list[str], list]:
-        return ([f"{p.column}=?" for p in parts if p.expr is not types.MISSING],
-                [_compile(p.expr, p.compiler) for p in parts if p.expr is not types.MISSING])
+    def _build_insert(parts: typing.Iterable[part]) -> tuple[tuple[str, ...], list]:
+        MISSING = types.MISSING
+        columns: list[str] = []
+        values: list = []
+        for column, expr, compiler in map(_PART_GET, parts):
+            if expr is MISSING:
+                continue
+            columns.append(column)
+            values.append(compiler(expr))
+        return tuple(columns), values
 
     @staticmethod
-    def _decompile_all(values: typing.Iterable, parts: typing.Iterable[part]) -> typing.Iterable:
-        return [_decompile(v, p.decompiler) for v, p in zip(values, parts)]
+    def _decompile_row(row: typing.Sequence,
+                       decompilers: list[tuple[int, typing.Callable[[typing.Any], typing.Any]]]
+                       ) -> list:
+        values = list(row)
+        for i, decompiler in decompilers:
+            values[i] = decompiler(values[i])
+        return values
+
+    def _prepare_where(self, operation: str, parts: typing.Iterable[part], matchall: bool,
+                       columns: tuple[str, ...] = ()) -> tuple[str, list]:
+        shape, parameters = self._where_plan(parts)
+        if shape is not None:
+            return _template(self.table, operation, shape, matchall, columns), parameters
+
+        # the shape contains an expression which cannot be cached; build the query in full
+        joinwith = _AND if matchall else _OR
+        statements, parameters = self._build_where(parts)
+        return _assemble(self.table, operation, joinwith.join(statements), columns), parameters
 
     def get(self, parts: typing.Iterable[part], batchsize: int = None, matchall: bool = True,
-            builder: type[types.T] = None
+            builder: type[types.T] = None,
+            decompilers: typing.Sequence[typing.Callable[[typing.Any], typing.Any]] = None
             ) -> types.T | list[types.T] | typing.Any | list[typing.Any] | None:
+        # `decompilers` maps the result columns when `parts` only holds the where-clause
+        if decompilers is None:
+            decompilers = [p.decompiler for p in parts]
+
         # prepare query
-        joinwith = " AND " if matchall else " OR "
-        statements, parameters = self._build_where(parts)
-        if parameters:
-            query = f"SELECT * FROM {self.table} WHERE {joinwith.join(statements)}"
-            args = (query, parameters)
-        else:
-            query = f"SELECT * FROM {self.table}"
-            args = (query,)
+        query, parameters = self._prepare_where("SELECT", parts, matchall)
 
         # interact with db
-        with self._db_conn as (conn, cur):
-            excecution = cur.execute(*args)
-            if batchsize is None:
-                result = excecution.fetchall()
-            else:
-                result = excecution.fetchmany(batchsize)
+        excecution = self._read_conn.execute(query, parameters)
+        if batchsize is None:
+            result = excecution.fetchall()
+        else:
+            result = excecution.fetchmany(batchsize)
 
         # turn query into instances of builder (if applicable)
         if not result:
             return
-        if len(result[0]) != len(parts):
+        if len(result[0]) != len(decompilers):
             raise ValueError(f"insufficient number of parts provided; expected {len(result[0])}, "
-                             f"got {len(parts)}")
-        if not builder:
-            final = [self._decompile_all(dataset, parts) for dataset in result]
+                             f"got {len(decompilers)}")
+
+        # identity (`MISSING`) decompilers are skipped, so plain columns cost no call per row
+        MISSING = types.MISSING
+        convert = [(i, d) for i, d in enumerate(decompilers) if d is not MISSING]
+        rows = [self._decompile_row(dataset, convert) for dataset in result]
+        if builder:
+            final = [builder(*values) for values in rows]
         else:
-            final = [builder(*self._decompile_all(dataset, parts)) for dataset in result]
+            final = rows
         return final[0] if batchsize == 1 else final
 
+    def get_columns(self, parts: typing.Iterable[part], matchall: bool = True,
+                    columns: typing.Iterable[str] = None,
+                    decompilers: typing.Sequence[typing.Callable[[typing.Any], typing.Any]] = None
+                    ) -> dict[str, list]:
+        # as in `get`, ``decompilers`` maps the result columns when `parts` is only the where-clause
+        if decompilers is None:
+            decompilers = [p.decompiler for p in parts]
+
+        # prepare query
+        query, parameters = self._prepare_where("SELECT", parts, matchall)
+
+        # interact with db
+        execution = self._read_conn.execute(query, parameters)
+        result = execution.fetchall()
+
+        # transpose rows into columns, decompiling only the ones requested
+        if not result:
+            return {}
+        if len(result[0]) != len(decompilers):
+            raise ValueError(f"insufficient number of parts provided; expected {len(result[0])}, "
+                             f"got {len(decompilers)}")
+        names = [description[0] for description in execution.description]
+        wanted = None if columns is None else set(columns)
+        return {name: [decompiler(v) for v in values]
+                for name, decompiler, values in zip(names, decompilers, zip(*result))
+                if wanted is None or name in wanted}
+
     def add(self, parts: typing.Iterable[part], connection: sqlite3.Connection = None,
             return_: typing.Callable[[sqlite3.Cursor], typing.Any] = None) -> typing.Any:
         # prepare for query
-        statements, parameters = self._build_insert(parts)
-        placeholders = ",".join("?" for _ in statements)
-        if parameters:
-            query = f"INSERT INTO {self.table} ({','.join(statements)}) VALUES ({placeholders})"
-            args = (query, tuple(parameters))
-        else:
-            query = f"INSERT INTO {self.table}"
-            args = (query,)
+        columns, parameters = self._build_insert(parts)
+        query = _template(self.table, "INSERT", columns=columns)
+        args = (query, tuple(parameters))
 
         # interact with db
         if connection:
@@ -343,47 +693,70 @@ class db:
                 ret = None
             conn.commit()
             return ret
-    
+
+    def add_many(self, parts_list: typing.Iterable[typing.Iterable[part]],
+                 connection: sqlite3.Connection = None, ignore: bool = False) -> None:
+        # prepare for query
+        parts_list = list(parts_list)
+        if not parts_list:
+            return
+        signature = [(p.column, p.compiler) for p in parts_list[0] if p.expr is not types.MISSING]
+        parameters = []
+        for parts in parts_list:
+            if [(p.column, p.compiler) for p in parts if p.expr is not types.MISSING] != signature:
+                raise ValueError("all rows must provide the same columns (and compilers)")
+            parameters.append(tuple(self._build_insert(parts)[1]))
+        operation = "INSERT OR IGNORE" if ignore else "INSERT"
+        query = _template(self.table, operation, columns=tuple([c for c, _ in signature]))
+
+        # interact with db
+        if connection:
+            connection.cursor().executemany(query, parameters)
+            return
+
+        with self._db_conn as (conn, cur):
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                cur.executemany(query, parameters)
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
     def remove(self, parts: typing.Iterable[part], matchall: bool = True,
                connection: sqlite3.Connection = None) -> None:
         # prepare query
-        joinwith = " AND " if matchall else " OR "
-        statements, parameters = self._build_where(parts)
-        if parameters:
-            query = f"DELETE FROM {self.table} WHERE {joinwith.join(statements)}"
-            args = (query, parameters)
-        else:
-            query = f"DELETE FROM {self.table}"
-            args = (query,)
+        query, parameters = self._prepare_where("DELETE", parts, matchall)
 
         # interact with db
         if connection:
             cur = connection.cursor()
-            cur.execute(*args)
+            cur.execute(query, parameters)
             return
 
         with self._db_conn as (conn, cur):
-            cur.execute(*args)
+            cur.execute(query, parameters)
             conn.commit()
 
     def edit(self, parts: typing.Iterable[part]):
-        set_statements, set_parameters = self._build_set(parts)
-        if not set_parameters and not set_statements:
+        set_parts = list(parts)
+        if all([p.expr is types.MISSING for p in set_parts]):
             raise ValueError("no changes are being made")
 
+        # the new values are only compiled once the editor is first used
+        set_clause = None
+
         def _edit(parts: typing.Iterable[db.part], matchall: bool = True,
                   connection: sqlite3.Connection = None) -> None:
+            nonlocal set_clause
+            if set_clause is None:
+                # the "column=?" statements are emitted by the (cached) query template
+                set_clause = self._build_insert(set_parts)
+            set_columns, set_parameters = set_clause
+
             # prepare query
-            where_statements, where_parameters = self._build_where(parts)
-            joinwith = " AND " if matchall else " OR "
-            parameters = tuple([*set_parameters, *where_parameters])
-            if where_parameters:
-                query = (f"UPDATE {self.table} SET {','.join(set_statements)} WHERE "
-                        f"{joinwith.join(where_statements)}")
-                args = (query, parameters)
-            else:
-                query = f"UPDATE {self.table} SET {','.join(set_statements)}"
-                args = (query, tuple(set_parameters))
+            query, where_parameters = self._prepare_where("UPDATE", parts, matchall, set_columns)
+            args = (query, tuple([*set_parameters, *where_parameters]))
 
             # interact with db
             if connection:
@@ -393,5 +766,5 @@ class db:
             with self._db_conn as (conn, cur):
                 result = cur.execute(*args)
                 conn.commit()
-        
+
         return _edit
@@ -17,17 +17,86 @@ import typing
 import time
 
 
+# codecs are stateless, so every mapping shares one instance of each
+_LIST_C = dbutils.ListCompiler()
+_LIST_STR_D = dbutils.ListDecompiler(str)
+_INT_LIST_C = dbutils.IntListCompiler()
+_INT_LIST_D = dbutils.IntListDecompiler()
+_DICT_C = dbutils.DictCompiler()
+_DICT_STR_D = dbutils.DictDecompiler(str, str)
+
+
+def _now_s() -> int:
+    # the `timestamp` columns have second granularity
+    return int(time.time())
+
+
+def _compile_parts(schema: tuple[tuple[str, typing.Callable, typing.Callable], ...]
+                   ) -> typing.Callable[..., list[dbutils.db.part]]:
+    """Generate a ``_parts(self, *columns)`` method for ``schema`` with the column loop
+    unrolled, so each call is a straight run of identity checks against `types.MISSING`.
+    
+    """
+    namespace = {"_MISSING": types.MISSING, "_part": dbutils.db.part}
+    params = []
+    body = []
+    for i, (column, compiler, decompiler) in enumerate(schema):
+        namespace[f"_c{i}"], namespace[f"_d{i}"] = compiler, decompiler
+        params.append(f"{column}=_MISSING")
+        body.append(f"    if {column} is not _MISSING:\n"
+                    f"        parts.append(_part({column!r}, {column}, _c{i}, _d{i}))\n")
+    source = (f"def _parts(self, {', '.join(params)}):\n"
+              "    parts = []\n"
+              f"{''.join(body)}"
+              "    return parts\n")
+    exec(source, namespace)
+    return namespace["_parts"]
+
+
 class TableMapping(typing.Generic[types.T]):
+    __slots__ = ("_registrar", "_db_conn", "_db_conn_ro", "db")
+    DDL: str
+    # (column, compiler, decompiler) for every column, in table order
+    _SCHEMA: tuple[tuple[str, typing.Callable, typing.Callable], ...]
+
     def __init_subclass__(cls, table: str = None, *args, **kwargs) -> None:
         cls.table = table
+        schema = getattr(cls, "_SCHEMA", ())
+        cls._DECOMPILERS = tuple([decompiler for _, _, decompiler in schema])
+        cls._parts = _compile_parts(schema)
 
     def __init__(self, registrar: "Registrar") -> None:
         self._registrar = registrar
         self._db_conn = registrar._db_conn
+        self._db_conn_ro = registrar._db_conn_ro
         self._ensure_table_exists()
-        self.db = dbutils.db(self._db_conn, self.table)
+        self.db = dbutils.db(self._db_conn, self.table, self._db_conn_ro)
 
     def _ensure_table_exists(self) -> None:
+        # `Registrar` creates all tables in one transaction up front
+        if self._db_conn.schema_ready:
+            return
+        with self._db_conn as (conn, cur):
+            cur.executescript(self.DDL)
+
+    @classmethod
+    def _upgrade_values(cls, cur: sqlite3.Cursor) -> None:
+        # integer lists written before they were stored as BLOBs are still TEXT, and lists and
+        # dicts written before JSON still use the delimiter format
+        for column, compiler, decompiler in cls._SCHEMA:
+            if compiler is _INT_LIST_C:
+                where = f"typeof({column}) = 'text'"
+            elif compiler is _LIST_C or compiler is _DICT_C:
+                where = f"typeof({column}) = 'text' AND substr({column}, 1, 1) = char(134)"
+            else:
+                continue
+            rows = cur.execute(f"SELECT rowid, {column} FROM {cls.table} "
+                               f"WHERE {where}").fetchall()
+            cur.executemany(f"UPDATE {cls.table} SET {column}=? WHERE rowid=?",
+                            [(compiler(decompiler(value)), rowid) for rowid, value in rows])
+
+    def _parts(self, *values: typing.Any) -> list[dbutils.db.part]:
+        # replaced on every subclass by the version generated from its `_SCHEMA`
         raise NotImplementedError()
     
     def add(self, *args, **kwargs) -> None:
@@ -44,39 +113,129 @@ class TableMapping(typing.Generic[types.T]):
 
 
 class Users(TableMapping[models.User], table="USERS"):
-    def _ensure_table_exists(self) -> None:
+    __slots__ = ("_unique",)
+    DDL = """CREATE TABLE IF NOT EXISTS USERS (
+            user_id            INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+            active             INTEGER NOT NULL DEFAULT 1,
+            timestamp          INTEGER NOT NULL,
+            discord_id         TEXT NOT NULL,
+            username           TEXT NOT NULL,
+            previous_usernames TEXT,
+            num_name_changes   INTEGER NOT NULL DEFAULT 0,
+            team               INTEGER)"""
+    INDEX_DDL = """CREATE UNIQUE INDEX IF NOT EXISTS idx_users_discord_id ON USERS(discord_id);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username ON USERS(username)"""
+    _SCHEMA = (
+        ("user_id",            types.MISSING, types.MISSING),
+        ("active",             types.MISSING, bool),
+        ("timestamp",          types.MISSING, types.MISSING),
+        ("discord_id",         str, types.MISSING),
+        ("username",           types.MISSING, types.MISSING),
+        ("previous_usernames", _LIST_C, _LIST_STR_D),
+        ("num_name_changes",   types.MISSING, types.MISSING),
+        ("team",               types.MISSING, types.MISSING),
+    )
+
+    # only used when the unique indexes could not be created
+    _STMT_BY_DISCORD_ID = "SELECT 1 FROM USERS WHERE discord_id=? LIMIT 1"
+    _STMT_BY_USERNAME = "SELECT 1 FROM USERS WHERE username=? LIMIT 1"
+
+    # with the unique indexes in place, adding is a single round-trip; RETURNING needs SQLite
+    # 3.35, older versions read the cursor's `lastrowid` and `rowcount` instead
+    _RETURNING = sqlite3.sqlite_version_info >= (3, 35)
+    _ADD_STMT = ("INSERT INTO USERS (discord_id,username,timestamp) VALUES (?,?,?) "
+                 "RETURNING user_id")
+    _ADD_OR_IGNORE_STMT = ("INSERT INTO USERS (discord_id,username,timestamp) VALUES (?,?,?) "
+                           "ON CONFLICT DO NOTHING RETURNING user_id")
+    _INSERT_STMT = "INSERT INTO USERS (discord_id,username,timestamp) VALUES (?,?,?)"
+    _INSERT_OR_IGNORE_STMT = ("INSERT OR IGNORE INTO USERS (discord_id,username,timestamp) "
+                              "VALUES (?,?,?)")
+
+    def __init__(self, registrar: "Registrar") -> None:
+        super().__init__(registrar)
+        self._unique = self._ensure_unique_indexes()
+
+    def _ensure_unique_indexes(self) -> bool:
+        # databases written before the indexes existed may hold duplicates (`add` with
+        # ``ignore=True`` used to insert them); uniqueness is then checked in Python instead
         with self._db_conn as (conn, cur):
-            cur.execute("""CREATE TABLE IF NOT EXISTS USERS (
-                user_id            INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
-                active             INTEGER NOT NULL DEFAULT 1,
-                timestamp          INTEGER NOT NULL,
-                discord_id         TEXT NOT NULL,
-                username           TEXT NOT NULL,
-                previous_usernames TEXT,
-                num_name_changes   INTEGER NOT NULL DEFAULT 0,
-                team               INTEGER)""")
-            conn.commit()
+            try:
+                cur.executescript(f"BEGIN;{self.INDEX_DDL};COMMIT;")
+            except sqlite3.IntegrityError:
+                conn.rollback()
+                return False
+        return True
 
     def _ensure_discord_id_not_exists(self, discord_id: int | str) -> None:
-        if self.get(discord_id=discord_id):
+        if self._db_conn.execute(self._STMT_BY_DISCORD_ID, (str(discord_id),)).fetchone():
             raise ValueError(f"the discord_id '{discord_id}' already exists "
                              "in the USERS table")
     
     def _ensure_username_not_exists(self, username: str) -> None:
-        if self.get(username=username):
+        if self._db_conn.execute(self._STMT_BY_USERNAME, (username,)).fetchone():
             raise ValueError(f"the username '{username}' already exists "
                              "in the USERS table")
-    
+
     def add(self, discord_id: int | str, username: str,
             connection_override: sqlite3.Connection = None, ignore: bool = False) -> int:
-        if not ignore:
+        """Add a user and return its ``user_id``. A ``discord_id`` or ``username`` that is
+        already taken raises `ValueError`, unless ``ignore`` is set: the user is then not
+        added and ``None`` is returned. On databases that already hold duplicates (so the
+        unique indexes could not be created), ``ignore`` instead skips the checks and adds the
+        user regardless, as it always did.
+        
+        """
+        execute = (connection_override or self._db_conn).execute
+        if self._RETURNING:
+            query = self._ADD_OR_IGNORE_STMT if ignore else self._ADD_STMT
+        else:
+            query = self._INSERT_OR_IGNORE_STMT if ignore else self._INSERT_STMT
+        if not self._unique and not ignore:
             self._ensure_discord_id_not_exists(discord_id)
             self._ensure_username_not_exists(username)
-        self.db.add([
-            dbutils.db.part("discord_id", discord_id, str),
-            dbutils.db.part("username", username),
-            dbutils.db.part("timestamp", int(time.time()))
-        ], connection_override, return_=lambda x: x.lastrowid)
+        try:
+            cur = execute(query, (str(discord_id), username, _now_s()))
+            if not self._RETURNING:
+                # an ignored row changes nothing and leaves `lastrowid` untouched
+                return cur.lastrowid if cur.rowcount else None
+            # fetchall steps the statement to completion, which ends the implicit transaction
+            rows = cur.fetchall()
+        except sqlite3.IntegrityError as e:
+            if not str(e).startswith("UNIQUE"):
+                raise
+            column = str(e).rpartition(".")[2]
+            value = discord_id if column == "discord_id" else username
+            raise ValueError(f"the {column} '{value}' already exists in the USERS table") from e
+        return rows[0][0] if rows else None
+
+    def add_many(self, records: typing.Iterable[tuple[int | str, str]],
+                 connection_override: sqlite3.Connection = None, ignore: bool = False) -> None:
+        """Add every ``(discord_id, username)`` record in one transaction. If a record conflicts
+        with an existing user or another record, `ValueError` is raised and no records are
+        added, unless ``ignore`` is set: conflicting records are then skipped.
+        
+        """
+        records = [(str(discord_id), username) for discord_id, username in records]
+        if not self._unique and not ignore:
+            if (len({d for d, _ in records}) < len(records)
+                    or len({u for _, u in records}) < len(records)):
+                raise ValueError("the records contain duplicate discord_ids or usernames")
+            for discord_id, username in records:
+                self._ensure_discord_id_not_exists(discord_id)
+                self._ensure_username_not_exists(username)
+        timestamp = _now_s()
+        try:
+            self.db.add_many([[
+                dbutils.db.part("discord_id", discord_id),
+                dbutils.db.part("username", username),
+                dbutils.db.part("timestamp", timestamp)
+            ] for discord_id, username in records], connection_override, ignore)
+        except sqlite3.IntegrityError as e:
+            if not str(e).startswith("UNIQUE"):
+                raise
+            column = str(e).rpartition(".")[2]
+            raise ValueError(f"a {column} of the records already exists in the USERS table "
+                             "or is repeated in the records") from e
 
     def get(self, batchsize: int = None, matchall: bool = True,
             user_id: int | types.Expression[int] = types.MISSING,
@@ -89,17 +248,10 @@ class Users(TableMapping[models.User], table="USERS"):
             team: int | types.Expression[int] = types.MISSING
             ) -> models.User | list[models.User] | None:
         # run db.get
-        return self.db.get([
-            dbutils.db.part("user_id", user_id),
-            dbutils.db.part("active", active, decompiler=bool),
-            dbutils.db.part("timestamp", timestamp),
-            dbutils.db.part("discord_id", discord_id, str),
-            dbutils.db.part("username", username),
-            dbutils.db.part("previous_usernames", previous_usernames, dbutils.ListCompiler(),
-                            dbutils.ListDecompiler(str)),
-            dbutils.db.part("num_name_changes", num_name_changes),
-            dbutils.db.part("team", team)
-        ], batchsize, matchall, models.User)
+        return self.db.get(self._parts(
+            user_id, active, timestamp, discord_id, username, previous_usernames, num_name_changes,
+            team
+        ), batchsize, matchall, models.User, self._DECOMPILERS)
 
     def remove(self, matchall: bool = True, user_id: int | types.Expression[int] = types.MISSING,
                active: bool | types.Expression[bool] = types.MISSING,
@@ -111,17 +263,10 @@ class Users(TableMapping[models.User], table="USERS"):
                team: int | types.Expression[int] = types.MISSING,
                connection_override: sqlite3.Connection = None) -> None:
         # run db.remove
-        return self.db.remove([
-            dbutils.db.part("user_id", user_id),
-            dbutils.db.part("active", active),
-            dbutils.db.part("timestamp", timestamp),
-            dbutils.db.part("discord_id", discord_id, str),
-            dbutils.db.part("username", username),
-            dbutils.db.part("previous_usernames", previous_usernames, dbutils.ListCompiler(),
-                            dbutils.ListDecompiler(str)),
-            dbutils.db.part("num_name_changes", num_name_changes),
-            dbutils.db.part("team", team)
-        ], matchall, connection_override)
+        return self.db.remove(self._parts(
+            user_id, active, timestamp, discord_id, username, previous_usernames, num_name_changes,
+            team
+        ), matchall, connection_override)
 
     def edit(self, user_id: int = types.MISSING, active: bool = types.MISSING,
              timestamp: int = types.MISSING, discord_id: int | str = types.MISSING,
@@ -129,16 +274,10 @@ class Users(TableMapping[models.User], table="USERS"):
              previous_usernames: typing.Iterable[str] = types.MISSING,
              num_name_changes: int = types.MISSING, team: int = types.MISSING):
         
-        _editor = self.db.edit([
-            dbutils.db.part("user_id", user_id),
-            dbutils.db.part("active", active),
-            dbutils.db.part("timestamp", timestamp),
-            dbutils.db.part("discord_id", discord_id, str),
-            dbutils.db.part("username", username),
-            dbutils.db.part("previous_usernames", previous_usernames, dbutils.ListCompiler()),
-            dbutils.db.part("num_name_changes", num_name_changes),
-            dbutils.db.part("team", team)
-        ])
+        _editor = self.db.edit(self._parts(
+            user_id, active, timestamp, discord_id, username, previous_usernames, num_name_changes,
+            team
+        ))
 
         def _edit(matchall: bool = True, user_id: int | types.Expression[int] = types.MISSING,
                   active: bool | types.Expression[bool] = types.MISSING,
@@ -149,109 +288,111 @@ class Users(TableMapping[models.User], table="USERS"):
                   num_name_changes: int | types.Expression[int] = types.MISSING,
                   team: int | types.Expression[int] = types.MISSING,
                   connection_override: sqlite3.Connection = None) -> None:
-            return _editor([
-                dbutils.db.part("user_id", user_id),
-                dbutils.db.part("active", active),
-                dbutils.db.part("timestamp", timestamp),
-                dbutils.db.part("discord_id", discord_id, str),
-                dbutils.db.part("username", username),
-                dbutils.db.part("previous_usernames", previous_usernames, dbutils.ListCompiler(),
-                                dbutils.ListDecompiler(str)),
-                dbutils.db.part("num_name_changes", num_name_changes),
-                dbutils.db.part("team", team)
-            ], matchall, connection_override)
+            return _editor(self._parts(
+                user_id, active, timestamp, discord_id, username, previous_usernames,
+                num_name_changes, team
+            ), matchall, connection_override)
 
         return _edit
 
 
 class Teams(TableMapping[models.Team], table="TEAMS"):
-    def _ensure_table_exists(self) -> None:
-        with self._db_conn as (conn, cur):
-            cur.execute("""CREATE TABLE IF NOT EXISTS TEAMS (
-                id     INTEGER NOT NULL,
-                name   TEXT NOT NULL,
-                active INTEGER NOT NULL DEFAULT 1)""")
-            conn.commit()
+    __slots__ = ()
+    DDL = """CREATE TABLE IF NOT EXISTS TEAMS (
+            id     INTEGER NOT NULL,
+            name   TEXT NOT NULL,
+            active INTEGER NOT NULL DEFAULT 1)"""
+    _SCHEMA = (
+        ("id",     types.MISSING, types.MISSING),
+        ("name",   types.MISSING, types.MISSING),
+        ("active", types.MISSING, bool),
+    )
 
     def add(self, id: int, name: str, connection_override: sqlite3.Connection = None,
             active: bool = types.MISSING) -> None:
-        self.db.add([
-            dbutils.db.part("id", id),
-            dbutils.db.part("name", name),
-            dbutils.db.part("active", active)
-        ], connection_override)
+        self.db.add(self._parts(id, name, active), connection_override)
+
+    def add_many(self, records: typing.Iterable[tuple[int, str]],
+                 connection_override: sqlite3.Connection = None) -> None:
+        self.db.add_many([self._parts(id, name) for id, name in records], connection_override)
     
     def get(self, batchsize: int = None, matchall: bool = True,
             id: int | types.Expression[int] = types.MISSING,
             name: str | types.Expression[str] = types.MISSING,
             active: bool | types.Expression[bool] = types.MISSING
             ) -> models.Team | list[models.Team] | None:
-        return self.db.get([
-            dbutils.db.part("id", id),
-            dbutils.db.part("name", name),
-            dbutils.db.part("active", active, decompiler=bool)
-        ], batchsize, matchall, models.Team)
+        return self.db.get(self._parts(id, name, active), batchsize, matchall, models.Team,
+                           self._DECOMPILERS)
     
     def remove(self, matchall: bool = True, id: int | types.Expression[int] = types.MISSING,
                name: str | types.Expression[str] = types.MISSING,
                active: bool | types.Expression[bool] = types.MISSING,
                connection_override: sqlite3.Connection = None) -> None:
-        return self.db.remove([
-            dbutils.db.part("id", id),
-            dbutils.db.part("name", name),
-            dbutils.db.part("active", active)
-        ], matchall, connection_override)
+        return self.db.remove(self._parts(id, name, active), matchall, connection_override)
 
     def edit(self, id: int | types.Expression[int] = types.MISSING,
              name: str | types.Expression[str] = types.MISSING,
              active: bool | types.Expression[bool] = types.MISSING):
-        _editor = self.db.edit([
-            dbutils.db.part("id", id),
-            dbutils.db.part("name", name),
-            dbutils.db.part("active", active)
-        ])
+        _editor = self.db.edit(self._parts(id, name, active))
 
         def _edit(matchall: bool = True, id: int | types.Expression[int] = types.MISSING,
                   name: str | types.Expression[str] = types.MISSING,
                   active: bool | types.Expression[bool] = types.MISSING,
                   connection_override: sqlite3.Connection = None) -> None:
-            return _editor([
-                dbutils.db.part("id", id),
-                dbutils.db.part("name", name),
-                dbutils.db.part("active", active)
-            ], matchall, connection_override)
+            return _editor(self._parts(id, name, active), matchall, connection_override)
 
         return _edit
 
 
 class Serieses(TableMapping[models.Series], table="SERIESES"):
-    def _ensure_table_exists(self) -> None:
-        with self._db_conn as (conn, cur):
-            cur.execute("""CREATE TABLE IF NOT EXISTS SERIESES (
-                series_id    INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
-                specifiers   TEXT,
-                active       INTEGER NOT NULL DEFAULT 1,
-                timestamp    INTEGER NOT NULL,
-                game_ids     TEXT NOT NULL,
-                team_1_id    INTEGER NOT NULL,
-                team_2_id    INTEGER NOT NULL,
-                team_1_score INTEGER NOT NULL,
-                team_2_score INTEGER NOT NULL)""")
-            conn.commit()
+    __slots__ = ()
+    DDL = """CREATE TABLE IF NOT EXISTS SERIESES (
+            series_id    INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+            specifiers   TEXT,
+            active       INTEGER NOT NULL DEFAULT 1,
+            timestamp    INTEGER NOT NULL,
+            game_ids     BLOB NOT NULL,
+            team_1_id    INTEGER NOT NULL,
+            team_2_id    INTEGER NOT NULL,
+            team_1_score INTEGER NOT NULL,
+            team_2_score INTEGER NOT NULL)"""
+    _SCHEMA = (
+        ("series_id",    types.MISSING, types.MISSING),
+        ("specifiers",   _DICT_C, _DICT_STR_D),
+        ("active",       types.MISSING, bool),
+        ("timestamp",    types.MISSING, types.MISSING),
+        ("game_ids",     _INT_LIST_C, _INT_LIST_D),
+        ("team_1_id",    types.MISSING, types.MISSING),
+        ("team_2_id",    types.MISSING, types.MISSING),
+        ("team_1_score", types.MISSING, types.MISSING),
+        ("team_2_score", types.MISSING, types.MISSING),
+    )
     
     def add(self, game_ids: list[int], team_1_id: int, team_2_id: int, team_1_score: int,
             team_2_score: int, series_id: int = types.MISSING,
             connection_override: sqlite3.Connection = None, **specifiers: str) -> int:
         return self.db.add([
             dbutils.db.part("series_id", series_id),
-            dbutils.db.part("specifiers", specifiers or types.MISSING, dbutils.DictCompiler()),
-            dbutils.db.part("timestamp", int(time.time())),
-            dbutils.db.part("game_ids", game_ids, dbutils.ListCompiler()),
+            dbutils.db.part("specifiers", specifiers or types.MISSING, _DICT_C),
+            dbutils.db.part("timestamp", _now_s()),
+            dbutils.db.part("game_ids", game_ids, _INT_LIST_C),
             dbutils.db.part("team_1_id", team_1_id),
             dbutils.db.part("team_2_id", team_2_id),
             dbutils.db.part("team_1_score", team_1_score),
             dbutils.db.part("team_2_score", team_2_score)
         ], connection_override, lambda x: x.lastrowid)
+
+    def add_many(self, records: typing.Iterable[tuple[list[int], int, int, int, int,
+                                                      dict[str, str] | None]],
+                 connection_override: sqlite3.Connection = None) -> None:
+        # records are (game_ids, team_1_id, team_2_id, team_1_score, team_2_score, specifiers)
+        timestamp = _now_s()
+        self.db.add_many([self._parts(
+            specifiers=specifiers or None, timestamp=timestamp, game_ids=game_ids,
+            team_1_id=team_1_id, team_2_id=team_2_id, team_1_score=team_1_score,
+            team_2_score=team_2_score
+        ) for (game_ids, team_1_id, team_2_id, team_1_score, team_2_score,
+               specifiers) in records], connection_override)
     
     def get(self, batchsize: int = None, matchall: bool = True,
             series_id: int | types.Expression[int] = types.MISSING,
@@ -265,19 +406,10 @@ class Serieses(TableMapping[models.Series], table="SERIESES"):
             team_2_score: int | types.Expression[int] = types.MISSING
             ) -> models.Series | list[models.Series] | None:
             
-        return self.db.get([
-            dbutils.db.part("series_id", series_id),
-            dbutils.db.part("specifiers", specifiers, dbutils.DictCompiler(),
-                            dbutils.DictDecompiler(str, str)),
-            dbutils.db.part("active", active, decompiler=bool),
-            dbutils.db.part("timestamp", timestamp),
-            dbutils.db.part("game_ids", game_ids, dbutils.ListCompiler(),
-                            dbutils.ListDecompiler(int)),
-            dbutils.db.part("team_1_id", team_1_id),
-            dbutils.db.part("team_2_id", team_2_id),
-            dbutils.db.part("team_1_score", team_1_score),
-            dbutils.db.part("team_2_score", team_2_score)
-        ], batchsize, matchall, models.Series)
+        return self.db.get(self._parts(
+            series_id, specifiers, active, timestamp, game_ids, team_1_id, team_2_id, team_1_score,
+            team_2_score
+        ), batchsize, matchall, models.Series, self._DECOMPILERS)
     
     def remove(self, matchall: bool = True,
                series_id: int | types.Expression[int] = types.MISSING,
@@ -292,34 +424,20 @@ class Serieses(TableMapping[models.Series], table="SERIESES"):
                connection_override: sqlite3.Connection = None
                ) -> models.Series | list[models.Series] | None:
 
-        return self.db.remove([
-            dbutils.db.part("series_id", series_id),
-            dbutils.db.part("specifiers", specifiers, dbutils.DictCompiler()),
-            dbutils.db.part("active", active, decompiler=bool),
-            dbutils.db.part("timestamp", timestamp),
-            dbutils.db.part("game_ids", game_ids, dbutils.ListCompiler()),
-            dbutils.db.part("team_1_id", team_1_id),
-            dbutils.db.part("team_2_id", team_2_id),
-            dbutils.db.part("team_1_score", team_1_score),
-            dbutils.db.part("team_2_score", team_2_score)
-        ], matchall, connection_override)
+        return self.db.remove(self._parts(
+            series_id, specifiers, active, timestamp, game_ids, team_1_id, team_2_id, team_1_score,
+            team_2_score
+        ), matchall, connection_override)
     
     def edit(self, series_id: int = types.MISSING,
              specifiers: dict[str, str] | None = types.MISSING, active: bool = types.MISSING,
              timestamp: int = types.MISSING, game_ids: list[int] = types.MISSING,
              team_1_id: int = types.MISSING, team_2_id: int = types.MISSING,
              team_1_score: int = types.MISSING, team_2_score: int = types.MISSING):
-        _editor = self.db.edit([
-            dbutils.db.part("series_id", series_id),
-            dbutils.db.part("specifiers", specifiers, dbutils.DictCompiler()),
-            dbutils.db.part("active", active, decompiler=bool),
-            dbutils.db.part("timestamp", timestamp),
-            dbutils.db.part("game_ids", game_ids, dbutils.ListCompiler()),
-            dbutils.db.part("team_1_id", team_1_id),
-            dbutils.db.part("team_2_id", team_2_id),
-            dbutils.db.part("team_1_score", team_1_score),
-            dbutils.db.part("team_2_score", team_2_score)
-        ])
+        _editor = self.db.edit(self._parts(
+            series_id, specifiers, active, timestamp, game_ids, team_1_id, team_2_id, team_1_score,
+            team_2_score
+        ))
 
         def _edit(matchall: bool = True, series_id: int | types.Expression[int] = types.MISSING,
                   specifiers: types.Expression[dict[str, str]] = types.MISSING,
@@ -332,51 +450,66 @@ class Serieses(TableMapping[models.Series], table="SERIESES"):
                   team_2_score: int | types.Expression[int] = types.MISSING,
                   connection_override: sqlite3.Connection = None) -> None:
             
-            return _editor([
-                dbutils.db.part("series_id", series_id),
-                dbutils.db.part("specifiers", specifiers, dbutils.DictCompiler()),
-                dbutils.db.part("active", active, decompiler=bool),
-                dbutils.db.part("timestamp", timestamp),
-                dbutils.db.part("game_ids", game_ids, dbutils.ListCompiler()),
-                dbutils.db.part("team_1_id", team_1_id),
-                dbutils.db.part("team_2_id", team_2_id),
-                dbutils.db.part("team_1_score", team_1_score),
-                dbutils.db.part("team_2_score", team_2_score)
-            ], matchall, connection_override)
+            return _editor(self._parts(
+                series_id, specifiers, active, timestamp, game_ids, team_1_id, team_2_id,
+                team_1_score, team_2_score
+            ), matchall, connection_override)
 
         return _edit
 
 
 class Games(TableMapping[models.Game], table="GAMES"):
-    def _ensure_table_exists(self) -> None:
-        with self._db_conn as (conn, cur):
-            cur.execute("""CREATE TABLE IF NOT EXISTS GAMES (
-                game_id         INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
-                active          INTEGER NOT NULL DEFAULT 1,
-                timestamp       INTEGER NOT NULL,
-                series_id       INTEGER NOT NULL,
-                team_1_id       INTEGER NOT NULL,
-                team_2_id       INTEGER NOT NULL,
-                team_1_score    INTEGER NOT NULL,
-                team_2_score    INTEGER NOT NULL,
-                team_1_user_ids TEXT NOT NULL,
-                team_2_user_ids TEXT NOT NULL)""")
-            conn.commit()
+    __slots__ = ()
+    DDL = """CREATE TABLE IF NOT EXISTS GAMES (
+            game_id         INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+            active          INTEGER NOT NULL DEFAULT 1,
+            timestamp       INTEGER NOT NULL,
+            series_id       INTEGER NOT NULL,
+            team_1_id       INTEGER NOT NULL,
+            team_2_id       INTEGER NOT NULL,
+            team_1_score    INTEGER NOT NULL,
+            team_2_score    INTEGER NOT NULL,
+            team_1_user_ids BLOB NOT NULL,
+            team_2_user_ids BLOB NOT NULL)"""
+    _SCHEMA = (
+        ("game_id",         types.MISSING, types.MISSING),
+        ("active",          types.MISSING, bool),
+        ("timestamp",       types.MISSING, types.MISSING),
+        ("series_id",       types.MISSING, types.MISSING),
+        ("team_1_id",       types.MISSING, types.MISSING),
+        ("team_2_id",       types.MISSING, types.MISSING),
+        ("team_1_score",    types.MISSING, types.MISSING),
+        ("team_2_score",    types.MISSING, types.MISSING),
+        ("team_1_user_ids", _INT_LIST_C, _INT_LIST_D),
+        ("team_2_user_ids", _INT_LIST_C, _INT_LIST_D),
+    )
     
     def add(self, series_id: int, team_1_id: int, team_2_id: int, team_1_score: int,
             team_2_score: int, team_1_user_ids: list[int], team_2_user_ids: list[int],
             game_id: int = types.MISSING, connection_override: sqlite3.Connection = None) -> None:
         self.db.add([
             dbutils.db.part("game_id", game_id),
-            dbutils.db.part("timestamp", int(time.time())),
+            dbutils.db.part("timestamp", _now_s()),
             dbutils.db.part("series_id", series_id),
             dbutils.db.part("team_1_id", team_1_id),
             dbutils.db.part("team_2_id", team_2_id),
             dbutils.db.part("team_1_score", team_1_score),
             dbutils.db.part("team_2_score", team_2_score),
-            dbutils.db.part("team_1_user_ids", team_1_user_ids, dbutils.ListCompiler()),
-            dbutils.db.part("team_2_user_ids", team_2_user_ids, dbutils.ListCompiler())
+            dbutils.db.part("team_1_user_ids", team_1_user_ids, _INT_LIST_C),
+            dbutils.db.part("team_2_user_ids", team_2_user_ids, _INT_LIST_C)
         ], connection_override)
+
+    def add_many(self, records: typing.Iterable[tuple[int, int, int, int, int, list[int],
+                                                      list[int]]],
+                 connection_override: sqlite3.Connection = None) -> None:
+        # records are ordered as the positional arguments of `add`
+        timestamp = _now_s()
+        self.db.add_many([self._parts(
+            timestamp=timestamp, series_id=series_id, team_1_id=team_1_id, team_2_id=team_2_id,
+            team_1_score=team_1_score, team_2_score=team_2_score,
+            team_1_user_ids=team_1_user_ids, team_2_user_ids=team_2_user_ids
+        ) for (series_id, team_1_id, team_2_id, team_1_score, team_2_score, team_1_user_ids,
+               team_2_user_ids) in records], connection_override)
     
     def get(self, batchsize: int = None, matchall: bool = True,
             series_id: int | types.Expression[int] = types.MISSING,
@@ -390,20 +523,10 @@ class Games(TableMapping[models.Game], table="GAMES"):
             team_2_user_ids: list[int] | types.Expression[list[int]] = types.MISSING,
             game_id: int | types.Expression[int] = types.MISSING
             ) -> models.Game | list[models.Game] | None:
-        return self.db.get([
-            dbutils.db.part("game_id", game_id),
-            dbutils.db.part("active", active, decompiler=bool),
-            dbutils.db.part("timestamp", timestamp),
-            dbutils.db.part("series_id", series_id),
-            dbutils.db.part("team_1_id", team_1_id),
-            dbutils.db.part("team_2_id", team_2_id),
-            dbutils.db.part("team_1_score", team_1_score),
-            dbutils.db.part("team_2_score", team_2_score),
-            dbutils.db.part("team_1_user_ids", team_1_user_ids, dbutils.ListCompiler(),
-                            dbutils.ListDecompiler(int)),
-            dbutils.db.part("team_2_user_ids", team_2_user_ids, dbutils.ListCompiler(),
-                            dbutils.ListDecompiler(int))
-        ], batchsize, matchall, models.Game)
+        return self.db.get(self._parts(
+            game_id, active, timestamp, series_id, team_1_id, team_2_id, team_1_score,
+            team_2_score, team_1_user_ids, team_2_user_ids
+        ), batchsize, matchall, models.Game, self._DECOMPILERS)
     
     def remove(self, matchall: bool = True, series_id: int | types.Expression[int] = types.MISSING,
             active: bool | types.Expression[bool] = types.MISSING,
@@ -416,18 +539,10 @@ class Games(TableMapping[models.Game], table="GAMES"):
             team_2_user_ids: list[int] | types.Expression[list[int]] = types.MISSING,
             game_id: int | types.Expression[int] = types.MISSING,
             connection_override: sqlite3.Connection = None) -> None:
-        self.db.remove([
-            dbutils.db.part("game_id", game_id),
-            dbutils.db.part("active", active, decompiler=bool),
-            dbutils.db.part("timestamp", timestamp),
-            dbutils.db.part("series_id", series_id),
-            dbutils.db.part("team_1_id", team_1_id),
-            dbutils.db.part("team_2_id", team_2_id),
-            dbutils.db.part("team_1_score", team_1_score),
-            dbutils.db.part("team_2_score", team_2_score),
-            dbutils.db.part("team_1_user_ids", team_1_user_ids, dbutils.ListCompiler()),
-            dbutils.db.part("team_2_user_ids", team_2_user_ids, dbutils.ListCompiler())
-        ], matchall, connection_override)
+        self.db.remove(self._parts(
+            game_id, active, timestamp, series_id, team_1_id, team_2_id, team_1_score,
+            team_2_score, team_1_user_ids, team_2_user_ids
+        ), matchall, connection_override)
 
     def edit(self, game_id: int = types.MISSING, active: bool = types.MISSING,
              timestamp: int = types.MISSING, series_id: int = types.MISSING,
@@ -435,18 +550,10 @@ class Games(TableMapping[models.Game], table="GAMES"):
              team_1_score: int = types.MISSING, team_2_score: int = types.MISSING,
              team_1_user_ids: list[int] = types.MISSING,
              team_2_user_ids: list[int] = types.MISSING):
-        _editor = self.db.edit([
-            dbutils.db.part("game_id", game_id),
-            dbutils.db.part("active", active),
-            dbutils.db.part("timestamp", timestamp),
-            dbutils.db.part("series_id", series_id),
-            dbutils.db.part("team_1_id", team_1_id),
-            dbutils.db.part("team_2_id", team_2_id),
-            dbutils.db.part("team_1_score", team_1_score),
-            dbutils.db.part("team_2_score", team_2_score),
-            dbutils.db.part("team_1_user_ids", team_1_user_ids, dbutils.ListCompiler()),
-            dbutils.db.part("team_2_user_ids", team_2_user_ids, dbutils.ListCompiler())
-        ])
+        _editor = self.db.edit(self._parts(
+            game_id, active, timestamp, series_id, team_1_id, team_2_id, team_1_score,
+            team_2_score, team_1_user_ids, team_2_user_ids
+        ))
 
         def _edit(matchall: bool = True, series_id: int | types.Expression[int] = types.MISSING,
                   active: bool | types.Expression[bool] = types.MISSING,
@@ -460,30 +567,57 @@ class Games(TableMapping[models.Game], table="GAMES"):
                   game_id: int | types.Expression[int] = types.MISSING,
                   connection_override: sqlite3.Connection = None) -> None:
             
-            _editor([
-                dbutils.db.part("game_id", game_id),
-                dbutils.db.part("active", active, decompiler=bool),
-                dbutils.db.part("timestamp", timestamp),
-                dbutils.db.part("series_id", series_id),
-                dbutils.db.part("team_1_id", team_1_id),
-                dbutils.db.part("team_2_id", team_2_id),
-                dbutils.db.part("team_1_score", team_1_score),
-                dbutils.db.part("team_2_score", team_2_score),
-                dbutils.db.part("team_1_user_ids", team_1_user_ids, dbutils.ListCompiler()),
-                dbutils.db.part("team_2_user_ids", team_2_user_ids, dbutils.ListCompiler())
-            ], matchall, connection_override)
+            _editor(self._parts(
+                game_id, active, timestamp, series_id, team_1_id, team_2_id, team_1_score,
+                team_2_score, team_1_user_ids, team_2_user_ids
+            ), matchall, connection_override)
 
         return _edit
 
 
 class Registrar:
-    def __init__(self, db_path: str) -> None:
-        self._db_conn = dbutils.AutoSqliteConnection(db_path)
+    # the format of the stored values, kept in the database's `user_version`; 1 packs the
+    # integer lists into BLOBs, 2 also rewrites delimited lists and dicts as JSON
+    STORAGE_VERSION = 2
+
+    def __init__(self, db_path: str, fast: bool = True) -> None:
+        self._db_conn = dbutils.AutoSqliteConnection(db_path, fast)
+        self._ensure_tables_exist()
+        self._upgrade_storage()
+        # reads get their own read-only connections; an in-memory database cannot be shared
+        if db_path in ("", ":memory:"):
+            self._db_conn_ro = self._db_conn
+        else:
+            self._db_conn_ro = dbutils.AutoSqliteConnection(db_path, fast, readonly=True)
         self.users = Users(self)
         self.teams = Teams(self)
         self.serieses = Serieses(self)
+        self.series = self.serieses
         self.games = Games(self)
     
-    @property
-    def series(self) -> Serieses:
-        return self.serieses
+    def _ensure_tables_exist(self) -> None:
+        ddl = "".join([f"{mapping.DDL};" for mapping in (Users, Teams, Serieses, Games)])
+        with self._db_conn as (conn, cur):
+            cur.executescript(f"BEGIN;{ddl}COMMIT;")
+        self._db_conn.schema_ready = True
+
+    def _upgrade_storage(self) -> None:
+        # rewrites the values stored by older versions once, so lookups compare like with like
+        if self._db_conn.execute("PRAGMA user_version").fetchone()[0] >= self.STORAGE_VERSION:
+            return
+        with self._db_conn as (conn, cur):
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                for mapping in (Users, Teams, Serieses, Games):
+                    mapping._upgrade_values(cur)
+                cur.execute(f"PRAGMA user_version={self.STORAGE_VERSION}")
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def close(self) -> None:
+        # closes the connections of every thread; later calls transparently reconnect
+        self._db_conn.close()
+        if self._db_conn_ro is not self._db_conn:
+            self._db_conn_ro.close()
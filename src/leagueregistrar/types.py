@@ -17,36 +17,78 @@ VT = typing.TypeVar("VT")
 KT = typing.TypeVar("KT")
 
 
-class MISSING:
-    """Represents a missing value.
+class _Missing:
+    """Represents a missing value. Calling it returns the given value unchanged, which makes
+    it usable as the default (identity) compiler and decompiler.
     
     """
+    __slots__ = ()
+
+    def __call__(self, value: T) -> T:
+        return value
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = _Missing()
 
 
 class Expression(typing.Generic[VT]):
+    __slots__ = ("value",)
     value: VT
-    def format(self, column: str, mutator: typing.Callable[[VT], KT]) -> tuple[str, KT]: ...
+
+    def shape(self) -> typing.Hashable:
+        """A hashable key which (together with a column) fully determines the statement
+        produced by this expression. Expressions returning ``None`` are never cached.
+        
+        """
+        return None
+
+    @staticmethod
+    def statement(column: str, shape: typing.Hashable) -> str:
+        raise NotImplementedError()
+
+    def parameters(self, mutator: typing.Callable[[VT], KT]) -> list[KT]:
+        raise NotImplementedError()
+
+    def format(self, column: str, mutator: typing.Callable[[VT], KT]) -> tuple[str, list[KT]]:
+        return self.statement(column, self.shape()), self.parameters(mutator)
 
 
 class Compiler:
+    __slots__ = ()
+
     def __call__(self, value: typing.Any) -> typing.Optional[str]:
         raise NotImplementedError()
 
 
 class Decompiler:
+    __slots__ = ("_types", "_padded")
+
     def __init__(self, *types: type[T]) -> None:
         self._types = types
+        self._padded: dict[int, tuple[type[T], ...]] = {}
+
+    def _expand(self, num_values: int) -> tuple[type[T], ...]:
+        # the padded types only depend on the number of values, so each length is built once
+        if num_values <= len(self._types):
+            return self._types
+        types = self._padded.get(num_values)
+        if types is None:
+            types = self._types + (self._types[-1],) * (num_values - len(self._types))
+            self._padded[num_values] = types
+        return types
     
     def format(self, *values) -> typing.Optional[T]:
         if not self._types:
             return values
-        num_types = len(self._types)
-        num_values = len(values)
-        if num_values > num_types:
-            types = list(self._types) + [self._types[-1]] * (num_values - num_types)
-        else:
-            types = self._types
-        return [t(v) for t, v in zip(types, values)]
+        if len(self._types) == 1:
+            return list(map(self._types[0], values))
+        return [t(v) for t, v in zip(self._expand(len(values)), values)]
 
     
     def __call__(self, value: str) -> typing.Optional[T]:
@@ -0,0 +1,140 @@
+import pathlib
+import sys
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+from src.leagueregistrar import dbutils, types
+
+
+SEP, KV, OPEN, CLOSE = chr(130), chr(131), chr(134), chr(135)
+
+
+def legacy_list(values: list) -> str:
+    # the delimiter-based encoding used before JSON
+    return SEP.join([f"{OPEN}{v}{CLOSE}" for v in values])
+
+
+def legacy_dict(values: dict) -> str:
+    return SEP.join([f"{OPEN}{k}{KV}{v}{CLOSE}" for k, v in values.items()])
+
+
+class ListCodecTest(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        compiler = dbutils.ListCompiler()
+        for values in (["a", "b,c", "é", "[x]"], ["a", 2**70]):
+            self.assertEqual(dbutils.ListDecompiler()(compiler(values)), values)
+        self.assertEqual(dbutils.ListDecompiler(int)(compiler([1, 2, 3])), [1, 2, 3])
+
+    def test_json_bytes(self) -> None:
+        self.assertEqual(dbutils.ListDecompiler(str)(b'["a","b"]'), ["a", "b"])
+
+    def test_legacy(self) -> None:
+        self.assertEqual(dbutils.ListDecompiler(str)(legacy_list(["a", "b"])), ["a", "b"])
+        self.assertEqual(dbutils.ListDecompiler(int)(legacy_list([1, 2])), [1, 2])
+        self.assertEqual(dbutils.ListDecompiler(str)(legacy_list(["a"]).encode()), ["a"])
+
+    def test_empty(self) -> None:
+        self.assertIsNone(dbutils.ListDecompiler(str)(None))
+
+
+class DictCodecTest(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        values = {"a": "1", "é": "b"}
+        encoded = dbutils.DictCompiler()(values)
+        self.assertEqual(dbutils.DictDecompiler(str, str)(encoded), values)
+        self.assertEqual(dbutils.DictDecompiler(str, int)(dbutils.DictCompiler()({"a": 1})),
+                         {"a": 1})
+
+    def test_legacy(self) -> None:
+        encoded = legacy_dict({"a": "1", "b": "2"})
+        self.assertEqual(dbutils.DictDecompiler(str, int)(encoded), {"a": 1, "b": 2})
+
+
+class IntListCodecTest(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        for values in ([], [0], [1, -2, 2**63 - 1, -2**63]):
+            encoded = dbutils.IntListCompiler()(values)
+            self.assertIsInstance(encoded, bytes)
+            self.assertEqual(len(encoded), 8 * len(values))
+            self.assertEqual(dbutils.IntListDecompiler()(encoded), values)
+
+    def test_text_fallback(self) -> None:
+        decompiler = dbutils.IntListDecompiler()
+        self.assertEqual(decompiler(dbutils.ListCompiler()([1, 2])), [1, 2])
+        self.assertEqual(decompiler(legacy_list([3, 4])), [3, 4])
+        self.assertIsNone(decompiler(None))
+
+
+class _InTwo(types.Expression):
+    # a user expression written against the original protocol, which only has `format`
+    __slots__ = ()
+
+    def __init__(self, a: int, b: int) -> None:
+        self.value = (a, b)
+
+    def format(self, column: str, compiler) -> tuple[str, list]:
+        return f"{column} IN (?, ?)", [compiler(v) for v in self.value]
+
+
+class WhereClauseTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = dbutils.db(None, "T")
+
+    def assertMatchesFormat(self, parts: list, matchall: bool = True) -> None:
+        # `_build_where` goes through every expression's `format`, as all queries used to
+        statements, parameters = dbutils.db._build_where(parts)
+        joinwith = " AND " if matchall else " OR "
+        for operation, columns in (("SELECT", ()), ("DELETE", ()), ("UPDATE", ("a",))):
+            expected = dbutils._assemble("T", operation, joinwith.join(statements), columns)
+            self.assertEqual(self.db._prepare_where(operation, parts, matchall, columns),
+                             (expected, parameters))
+
+    def test_literals(self) -> None:
+        part = dbutils.db.part
+        self.assertMatchesFormat([part("a", 1), part("b", types.MISSING), part("c", 3, str)])
+        self.assertMatchesFormat([part("a", 1), part("c", 3)], matchall=False)
+        self.assertMatchesFormat([part("a", types.MISSING)])
+
+    def test_comparisons(self) -> None:
+        part = dbutils.db.part
+        self.assertMatchesFormat([
+            part("a", dbutils.collate_nocase("x")),
+            part("b", dbutils.nocase_substr("y")),
+            part("c", dbutils.between(1, 2)),
+            part("d", dbutils.greater_than_or_equal(3)),
+            part("e", dbutils.custom("e % ? = ?", 2, 0)),
+            part("f", dbutils.is_("z"), str)
+        ])
+
+    def test_nested(self) -> None:
+        part = dbutils.db.part
+        or_, and_, is_not = dbutils.or_, dbutils.and_, dbutils.is_not
+        self.assertMatchesFormat([
+            part("a", or_(1, and_(is_not(2), dbutils.less_than(5)), dbutils.between(7, 9))),
+            part("b", is_not(or_("x", dbutils.substr("y")))),
+            part("c", and_(is_not(dbutils.custom("c > ?", 1)), or_(3, 4)))
+        ], matchall=False)
+
+    def test_missing_members(self) -> None:
+        part, MISSING = dbutils.db.part, types.MISSING
+        self.assertMatchesFormat([
+            part("a", dbutils.or_(MISSING, 1, dbutils.is_not(MISSING), 2)),
+            part("b", dbutils.and_(MISSING, dbutils.or_(MISSING, 3))),
+            part("c", dbutils.or_(MISSING, MISSING)),
+            part("d", dbutils.is_not(MISSING))
+        ])
+
+    def test_uncached_fallback(self) -> None:
+        part = dbutils.db.part
+        parts = [part("a", 1), part("b", _InTwo(2, 3), str),
+                 part("c", dbutils.or_(4, dbutils.is_not(_InTwo(5, 6))))]
+        self.assertIsNone(dbutils.db._where_plan(parts)[0])
+        cached = dbutils._template.cache_info().currsize
+        self.assertMatchesFormat(parts)
+        self.assertEqual(self.db._prepare_where("SELECT", parts, True)[1],
+                         [1, "2", "3", 4, 5, 6])
+        self.assertEqual(dbutils._template.cache_info().currsize, cached)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import unittest
+import unittest.mock
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+from src.leagueregistrar import Registrar
+from src.leagueregistrar.registrar import Users
+
+
+# the schema as created by the original (0.0.1) registrar, before the unique indexes
+BASELINE_DDL = """
+CREATE TABLE USERS (
+    user_id            INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    active             INTEGER NOT NULL DEFAULT 1,
+    timestamp          INTEGER NOT NULL,
+    discord_id         TEXT NOT NULL,
+    username           TEXT NOT NULL,
+    previous_usernames TEXT,
+    num_name_changes   INTEGER NOT NULL DEFAULT 0,
+    team               INTEGER);
+CREATE TABLE TEAMS (
+    id     INTEGER NOT NULL,
+    name   TEXT NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1);
+CREATE TABLE SERIESES (
+    series_id    INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    specifiers   TEXT,
+    active       INTEGER NOT NULL DEFAULT 1,
+    timestamp    INTEGER NOT NULL,
+    game_ids     TEXT NOT NULL,
+    team_1_id    INTEGER NOT NULL,
+    team_2_id    INTEGER NOT NULL,
+    team_1_score INTEGER NOT NULL,
+    team_2_score INTEGER NOT NULL);
+CREATE TABLE GAMES (
+    game_id         INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    active          INTEGER NOT NULL DEFAULT 1,
+    timestamp       INTEGER NOT NULL,
+    series_id       INTEGER NOT NULL,
+    team_1_id       INTEGER NOT NULL,
+    team_2_id       INTEGER NOT NULL,
+    team_1_score    INTEGER NOT NULL,
+    team_2_score    INTEGER NOT NULL,
+    team_1_user_ids TEXT NOT NULL,
+    team_2_user_ids TEXT NOT NULL);
+"""
+
+
+def baseline_list(values: list) -> str:
+    # the delimiter-based list encoding of the original registrar
+    return chr(130).join([f"{chr(134)}{v}{chr(135)}" for v in values])
+
+
+def baseline_dict(values: dict) -> str:
+    return chr(130).join([f"{chr(134)}{k}{chr(131)}{v}{chr(135)}" for k, v in values.items()])
+
+
+class BaselineDatabaseTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = str(pathlib.Path(self._dir.name, "db"))
+        conn = sqlite3.connect(self.path)
+        conn.executescript(BASELINE_DDL)
+        conn.executemany("INSERT INTO USERS (discord_id, username, previous_usernames, "
+                         "timestamp) VALUES (?, ?, ?, 0)",
+                         [("1", "a", baseline_list(["old"])), ("1", "b", None)])
+        conn.execute("INSERT INTO SERIESES (specifiers, game_ids, timestamp, team_1_id, "
+                     "team_2_id, team_1_score, team_2_score) VALUES (?, ?, 0, 1, 2, 3, 0)",
+                     (baseline_dict({"week": "3"}), baseline_list([1, 2, 3])))
+        conn.execute("INSERT INTO GAMES (series_id, timestamp, team_1_id, team_2_id, team_1_score, "
+                     "team_2_score, team_1_user_ids, team_2_user_ids) "
+                     "VALUES (1, 0, 1, 2, 3, 0, ?, ?)", (baseline_list([1, 2]), '[3,4]'))
+        conn.commit()
+        conn.close()
+        self.registrar = Registrar(self.path)
+
+    def tearDown(self) -> None:
+        self.registrar.close()
+        self._dir.cleanup()
+
+    def test_opens_with_duplicate_users(self) -> None:
+        self.assertEqual(len(self.registrar.users.get(discord_id=1)), 2)
+
+    def test_uniqueness_is_still_checked(self) -> None:
+        with self.assertRaises(ValueError):
+            self.registrar.users.add(1, "c")
+        with self.assertRaises(ValueError):
+            self.registrar.users.add(2, "a")
+        self.assertIsNotNone(self.registrar.users.add(2, "c"))
+        self.assertIsNotNone(self.registrar.users.add(1, "d", ignore=True))
+
+    def test_int_lists_are_repacked(self) -> None:
+        series = self.registrar.series.get(game_ids=[1, 2, 3], batchsize=1)
+        self.assertEqual(series.game_ids, [1, 2, 3])
+        game = self.registrar.games.get(team_1_user_ids=[1, 2], team_2_user_ids=[3, 4])
+        self.assertEqual(len(game), 1)
+        self.assertEqual(game[0].team_2_user_ids, [3, 4])
+
+    def test_lists_and_dicts_are_rewritten(self) -> None:
+        user = self.registrar.users.get(previous_usernames=["old"], batchsize=1)
+        self.assertEqual((user.username, user.previous_usernames), ("a", ["old"]))
+        series = self.registrar.series.get(specifiers={"week": "3"}, batchsize=1)
+        self.assertEqual(series.specifiers, {"week": "3"})
+
+    def test_add_many_checks_uniqueness(self) -> None:
+        users = self.registrar.users
+        with self.assertRaises(ValueError):
+            users.add_many([(2, "c"), (1, "d")])
+        with self.assertRaises(ValueError):
+            users.add_many([(2, "c"), (3, "c")])
+        users.add_many([(2, "c"), (3, "d")])
+        self.assertEqual(len(users.get()), 4)
+
+
+class NewDatabaseTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self.registrar = Registrar(str(pathlib.Path(self._dir.name, "db")))
+
+    def tearDown(self) -> None:
+        self.registrar.close()
+        self._dir.cleanup()
+
+    def test_duplicate_users(self) -> None:
+        users = self.registrar.users
+        user_id = users.add(1, "a")
+        self.assertEqual(users.get(user_id=user_id, batchsize=1).username, "a")
+        with self.assertRaises(ValueError):
+            users.add(1, "b")
+        with self.assertRaises(ValueError):
+            users.add(2, "a")
+        self.assertIsNone(users.add(1, "b", ignore=True))
+        self.assertEqual(len(users.get()), 1)
+
+    def test_models_are_slotted(self) -> None:
+        user = self.registrar.users.get(user_id=self.registrar.users.add(1, "a"), batchsize=1)
+        self.assertFalse(hasattr(user, "__dict__"))
+        self.assertIn("username='a'", repr(user))
+
+    def test_add_without_returning(self) -> None:
+        users = self.registrar.users
+        with unittest.mock.patch.object(Users, "_RETURNING", False):
+            self.assertEqual(users.add(1, "a"), 1)
+            with self.assertRaises(ValueError):
+                users.add(1, "b")
+            self.assertIsNone(users.add(1, "b", ignore=True))
+            user_id = users.add(2, "b", ignore=True)
+        self.assertEqual(users.get(username="b", batchsize=1).user_id, user_id)
+
+    def test_add_many(self) -> None:
+        users = self.registrar.users
+        users.add(1, "a")
+        with self.assertRaises(ValueError):
+            users.add_many([(2, "b"), (1, "c")])
+        self.assertEqual(len(users.get()), 1)
+        users.add_many([(2, "b"), (1, "c"), (3, "d")], ignore=True)
+        self.assertEqual([user.username for user in users.get()], ["a", "b", "d"])
+
+
+if __name__ == "__main__":
+    unittest.main()